@@ -74,7 +74,7 @@ PADDING_SECONDS = get_float_env('PADDING_SECONDS', 0.3)
 # ── Whisper (optimized for single-speaker channels) ──
 WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'large-v3-turbo')
 WHISPER_DEVICE = os.getenv('WHISPER_DEVICE', 'cpu')
-WHISPER_FP16 = get_bool_env('WHISPER_FP16', False)
+WHISPER_FP16 = get_bool_env('WHISPER_FP16', WHISPER_DEVICE == 'cuda')
 WHISPER_LANGUAGE = os.getenv('WHISPER_LANGUAGE', 'en')
 WHISPER_TEMPERATURE = get_float_env('WHISPER_TEMPERATURE', 0.0)
 WHISPER_BEAM_SIZE = get_int_env('WHISPER_BEAM_SIZE', 1)
@@ -87,9 +87,11 @@ WHISPER_COMPRESSION_RATIO_THRESHOLD = get_float_env(
 )
 WHISPER_PROMPT = os.getenv('WHISPER_PROMPT', '')
 WHISPER_CONFIDENCE_THRESHOLD = get_float_env('WHISPER_CONFIDENCE_THRESHOLD', 50.0)
+WHISPER_COMPILE = get_bool_env('WHISPER_COMPILE', False)
 
 # ── Output ──
 SAVE_JSON = get_bool_env('SAVE_JSON', True)
+TRANSCRIPTION_CACHE = get_bool_env('TRANSCRIPTION_CACHE', True)
 
 
 def get_whisper_options() -> dict[str, Any]:
@@ -5,6 +5,8 @@ import re
 from pathlib import Path
 from typing import Any, Callable, Optional
 
+import whisper
+
 from src.config import get_output_path_for_input
 from src.logging_config import get_logger
 from src.vad import process_audio
@@ -29,11 +31,13 @@ def transcribe_segments(
     audio_path: Path,
     original_input_path: Optional[Path] = None,
     progress_callback: Optional[Callable[[str, int, int], None]] = None,
+    model: Optional[whisper.Whisper] = None,
 ) -> dict[str, Any]:
     """Transcribe a pre-VAD-processed audio file by reading its mapping JSON.
 
     Expects <audio_path.stem>_mapping.json to exist in the output directory
-    (written by src.vad.process_audio).
+    (written by src.vad.process_audio). Without ``model``, the process-wide
+    cached model from src.whisper.load_whisper_model is used.
     """
     try:
         output_dir = (
@@ -59,6 +63,7 @@ def transcribe_segments(
             pre_processed_mapping=mapping_data['segments'],
             original_input_path=original_input_path,
             progress_callback=progress_callback,
+            model=model,
         )
 
         return {
@@ -79,6 +84,7 @@ def transcribe_audio(
     pre_processed_mapping: Optional[list[dict[str, Any]]] = None,
     original_input_path: Optional[Path] = None,
     progress_callback: Optional[Callable[[str, int, int], None]] = None,
+    model: Optional[whisper.Whisper] = None,
 ) -> dict[str, Any]:
     """Run the full transcription pipeline for a single audio file.
 
@@ -119,7 +125,10 @@ def transcribe_audio(
 
         logger.info(f"Found {len(segments_to_transcribe)} segments to transcribe")
         segments = transcribe_audio_segments(
-            segments_to_transcribe, output_vtt, progress_callback=progress_callback
+            segments_to_transcribe,
+            output_vtt,
+            progress_callback=progress_callback,
+            model=model,
         )
 
         logger.info("Saving transcription results...")
@@ -1,15 +1,25 @@
 """Whisper integration for audio transcription."""
 
+import functools
+import gc
+import hashlib
+import heapq
 import json
 import os
 import warnings
-from datetime import timedelta
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, TextIO
 
+import soundfile as sf
+import torch
+import torchaudio
 import whisper
 
 from src.config import (
+    OUTPUT_DIR,
+    TRANSCRIPTION_CACHE,
+    WHISPER_COMPILE,
     WHISPER_CONFIDENCE_THRESHOLD,
     WHISPER_DEVICE,
     WHISPER_MODEL,
@@ -28,12 +38,26 @@ warnings.filterwarnings("ignore", category=FutureWarning, module="whisper")
 # Any string that is the same short word repeated this many times is collapsed.
 _REPETITION_THRESHOLD = 6
 
+# Loaded models keyed by (model_name, device). Batch workers handle several
+# files per process, so this saves a full weight load on every file after
+# the first.
+_MODEL_CACHE: dict[tuple[str, str], whisper.Whisper] = {}
+
+# Per-segment results keyed by audio content + whisper settings, so re-runs
+# over the same audio skip the decode entirely. Entries hold whisper's raw
+# segment fields; repetition collapse and confidence are re-derived on read,
+# so changing that post-processing never serves stale output.
+_RESULT_CACHE_DIR = OUTPUT_DIR / ".cache"
+_CACHED_FIELDS = ("start", "end", "text", "avg_logprob")
+
 
 class WhisperError(Exception):
     """Base exception for whisper-related errors."""
 
 
+@functools.lru_cache(maxsize=1)
 def get_whisper_device() -> str:
+    """Validated WHISPER_DEVICE. Read once per process; it can't change mid-run."""
     device = os.getenv('WHISPER_DEVICE', WHISPER_DEVICE)
     if device not in ('cpu', 'cuda', 'mps'):
         raise ValueError(f"Invalid WHISPER_DEVICE: {device}. Must be cpu, cuda, or mps.")
@@ -41,13 +65,16 @@ def get_whisper_device() -> str:
 
 
 def format_timestamp(seconds: float) -> str:
-    """Format seconds into VTT timestamp format (HH:MM:SS.mmm)."""
-    td = timedelta(seconds=seconds)
-    hours = td.seconds // 3600
-    minutes = (td.seconds % 3600) // 60
-    secs = td.seconds % 60
-    millis = td.microseconds // 1000
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+    """Format seconds into VTT timestamp format (HH:MM:SS.mmm).
+
+    Rounds to the microsecond and truncates to milliseconds, same as the
+    timedelta-based version this replaces, but hours keep counting past 24.
+    """
+    ms = round(seconds * 1_000_000) // 1000
+    secs, ms = divmod(ms, 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{ms:03d}"
 
 
 def collapse_repetition(text: str, threshold: int = _REPETITION_THRESHOLD) -> str:
@@ -71,22 +98,81 @@ def collapse_repetition(text: str, threshold: int = _REPETITION_THRESHOLD) -> st
 
 
 def load_whisper_model(model_name: Optional[str] = None) -> whisper.Whisper:
-    """Load a whisper model from the local models dir.
+    """Load a whisper model from the local models dir, reusing it if already loaded.
 
+    Models stay cached for the life of the process (see unload_whisper_model).
     Raises WhisperError if the model file is missing — run `make setup-whisper`.
     """
-    model_name = model_name or os.getenv('WHISPER_MODEL', WHISPER_MODEL)
+    model_name = model_name or os.getenv('WHISPER_MODEL') or WHISPER_MODEL
+    device = get_whisper_device()
+    key = (model_name, device)
+    if key in _MODEL_CACHE:
+        return _MODEL_CACHE[key]
+
     model_path = WHISPER_MODELS_DIR / f"{model_name}.pt"
     if not model_path.exists():
         raise WhisperError(
             f"Model file not found: {model_path}. Run `make setup-whisper` first."
         )
     os.environ['WHISPER_MODELS_DIR'] = str(WHISPER_MODELS_DIR)
-    return whisper.load_model(
+    if device == 'cuda':
+        # Whisper's encoder input is always (n_mels, 3000), so cuDNN's
+        # autotuned conv algorithm is picked once and reused.
+        torch.backends.cudnn.benchmark = True
+    model = whisper.load_model(
         model_name,
-        device=get_whisper_device(),
+        device=device,
         download_root=str(WHISPER_MODELS_DIR),
     )
+    if WHISPER_COMPILE:
+        # Only the encoder: its input shape is fixed, so it compiles once. The
+        # decoder's KV cache is built from per-call forward hooks, which would
+        # force a recompile on every transcribe.
+        model.encoder.forward = torch.compile(
+            model.encoder.forward, mode="reduce-overhead"
+        )
+    _MODEL_CACHE[key] = model
+    return model
+
+
+def unload_whisper_model() -> None:
+    """Drop all cached models and hand their memory back (for memory-tight hosts)."""
+    _MODEL_CACHE.clear()
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+@functools.lru_cache(maxsize=None)
+def _resampler(orig_sr: int) -> torchaudio.transforms.Resample:
+    """One Resample module per source rate, so its filter kernel is built once."""
+    return torchaudio.transforms.Resample(orig_sr, whisper.audio.SAMPLE_RATE)
+
+
+def _load_audio(audio_path: Path, device: torch.device) -> torch.Tensor:
+    """Decode to a mono float32 tensor at whisper's sample rate.
+
+    Handing model.transcribe() a tensor skips the ffmpeg subprocess whisper
+    otherwise spawns per call, which dominates on short VAD segments. Whisper
+    computes the log-mel spectrogram wherever the tensor lives, so it goes to
+    the GPU only on CUDA; MPS keeps the CPU STFT and moves just the mel.
+    """
+    data, sr = sf.read(str(audio_path), dtype='float32', always_2d=True)
+    audio = torch.from_numpy(data.mean(axis=1))
+    if sr != whisper.audio.SAMPLE_RATE:
+        audio = _resampler(sr)(audio)
+    if device.type == 'cuda':
+        audio = audio.to(device)
+    return audio
+
+
+def _run_transcribe(
+    model: whisper.Whisper, audio: Any, options: dict[str, Any]
+) -> dict[str, Any]:
+    """model.transcribe() with autograd bookkeeping switched off."""
+    with torch.inference_mode():
+        result: dict[str, Any] = model.transcribe(audio, **options)
+    return result
 
 
 def _segments_from_result(
@@ -106,18 +192,70 @@ def _segments_from_result(
     return out
 
 
-def _write_vtt(output_path: Path, segments: list[dict[str, Any]]) -> None:
+def _format_cue(seg: dict[str, Any]) -> str:
+    return (
+        f"{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n"
+        f"{seg['text'].strip()}\n\n"
+    )
+
+
+def _open_vtt(output_path: Path) -> TextIO:
+    """Create output_path (and parents) and write the WEBVTT header."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("WEBVTT\n\n")
-        for seg in segments:
-            text = seg["text"].strip()
-            if not text:
-                continue
-            f.write(
-                f"{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n"
-                f"{text}\n\n"
-            )
+    f = open(output_path, "w", encoding="utf-8")
+    f.write("WEBVTT\n\n")
+    return f
+
+
+def _write_vtt(output_path: Path, segments: list[dict[str, Any]]) -> None:
+    cues = ''.join(_format_cue(seg) for seg in segments if seg["text"].strip())
+    with _open_vtt(output_path) as f:
+        f.write(cues)
+
+
+def _cache_path(audio_path: Path, model: whisper.Whisper) -> Optional[Path]:
+    """Result cache file for this audio under ``model`` and the current options.
+
+    Only models handed out by load_whisper_model have a known checkpoint name;
+    for any other caller-supplied model this returns None and nothing is cached.
+    """
+    name = next((n for (n, _), m in _MODEL_CACHE.items() if m is model), None)
+    if name is None:
+        return None
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(audio_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    settings = {
+        "model": name,
+        "dims": repr(model.dims),
+        "device": str(model.device),
+        "whisper": whisper.__version__,
+        "options": get_whisper_options(),
+        "fields": _CACHED_FIELDS,
+    }
+    h.update(json.dumps(settings, sort_keys=True).encode())
+    return _RESULT_CACHE_DIR / f"{h.hexdigest()}.json"
+
+
+def _read_cache(cache_path: Path) -> Optional[list[dict[str, Any]]]:
+    """Cached raw whisper segments, or None on a miss or unreadable entry."""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            segments: list[dict[str, Any]] = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return segments
+
+
+def _write_cache(cache_path: Path, segments: list[dict[str, Any]]) -> None:
+    """Write atomically so parallel workers never read a half-written entry."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(segments, f)
+    os.replace(tmp, cache_path)
 
 
 def transcribe_segment(
@@ -132,8 +270,19 @@ def transcribe_segment(
 
     try:
         model = model or load_whisper_model()
-        result = model.transcribe(str(audio_path), **get_whisper_options())
-        segments = _segments_from_result(result, offset=offset)
+        cache_path = _cache_path(audio_path, model) if TRANSCRIPTION_CACHE else None
+        raw = _read_cache(cache_path) if cache_path else None
+        if raw is None:
+            audio = _load_audio(audio_path, model.device)
+            result = _run_transcribe(model, audio, get_whisper_options())
+            raw = [
+                {k: s[k] for k in _CACHED_FIELDS if k in s}
+                for s in result.get("segments", [])
+                if isinstance(s, dict)
+            ]
+            if cache_path:
+                _write_cache(cache_path, raw)
+        segments = _segments_from_result({"segments": raw}, offset)
         if output_path and segments:
             _write_vtt(output_path, segments)
         return segments
@@ -145,42 +294,61 @@ def transcribe_audio_segments(
     segments: list[tuple[Path, float]],
     output_path: Optional[Path] = None,
     progress_callback: Optional[Callable[[str, int, int], None]] = None,
+    model: Optional[whisper.Whisper] = None,
 ) -> list[dict[str, Any]]:
     """Transcribe a list of (segment_path, start_offset) tuples with a shared model.
 
-    Dedupes identical lines across segments in the output VTT.
+    Cues are streamed to ``<output>.vtt.tmp`` as each segment finishes and
+    swapped into place once the loop completes, so an interrupted run leaves
+    the previous VTT intact. Identical lines across segments are written only
+    once.
     """
     total = len(segments)
     logger.info("Loading Whisper model...")
     if progress_callback:
         progress_callback("loading", 0, total)
 
-    model = load_whisper_model()
+    model = model or load_whisper_model()
     logger.info(f"VAD found {total} segments")
 
-    all_segments: list[dict[str, Any]] = []
-    for i, (segment_path, start_time) in enumerate(segments, 1):
-        logger.info(f"Processing segment {i}/{total}...")
-        if progress_callback:
-            progress_callback("transcribing", i, total)
-        try:
-            all_segments.extend(transcribe_segment(segment_path, None, start_time, model))
-        except Exception as e:
-            logger.warning(f"Failed to transcribe segment {segment_path}: {e}")
-
-    if output_path and all_segments:
-        seen: set[str] = set()
-        deduped: list[dict[str, Any]] = []
-        for seg in all_segments:
-            line = seg["text"].strip()
-            if line and line not in seen:
-                deduped.append(seg)
-                seen.add(line)
-        _write_vtt(output_path, deduped)
+    # Whisper emits each segment's cues in time order, so the per-segment
+    # lists are already sorted and only need a k-way merge at the end.
+    per_segment: list[list[dict[str, Any]]] = []
+    seen: set[str] = set()
+    tmp_path = output_path.with_suffix(".vtt.tmp") if output_path else None
+    vtt: Optional[TextIO] = None
+    try:
+        with ExitStack() as stack:
+            for i, (segment_path, start_time) in enumerate(segments, 1):
+                logger.info(f"Processing segment {i}/{total}...")
+                if progress_callback:
+                    progress_callback("transcribing", i, total)
+                try:
+                    segment_results = transcribe_segment(segment_path, None, start_time, model)
+                except Exception as e:
+                    logger.warning(f"Failed to transcribe segment {segment_path}: {e}")
+                    continue
+                per_segment.append(segment_results)
+
+                if not tmp_path or not segment_results:
+                    continue
+                if vtt is None:
+                    vtt = stack.enter_context(_open_vtt(tmp_path))
+                for seg in segment_results:
+                    line = seg["text"].strip()
+                    if line and line not in seen:
+                        vtt.write(_format_cue(seg))
+                        seen.add(line)
+    except BaseException:
+        if tmp_path:
+            tmp_path.unlink(missing_ok=True)
+        raise
+
+    if output_path and tmp_path and vtt is not None:
+        os.replace(tmp_path, output_path)
         logger.info(f"User transcript saved: {output_path.name}")
 
-    all_segments.sort(key=lambda s: s["start"])
-    return all_segments
+    return list(heapq.merge(*per_segment, key=lambda s: s["start"]))
 
 
 def filter_by_confidence(
@@ -212,7 +380,7 @@ def transcribe_file_direct(
         opts = get_whisper_options()
         if prompt:
             opts['initial_prompt'] = prompt
-        result = model.transcribe(str(audio_path), **opts)
+        result = _run_transcribe(model, str(audio_path), opts)
         segments = _segments_from_result(result)
         for seg in segments:
             if seg["text"]:
@@ -248,20 +416,38 @@ def regenerate_vtt_with_confidence(
 def regenerate_vtt_for_audio(
     audio_path: Path,
     confidence_threshold: Optional[float] = None,
+    force: bool = False,
 ) -> list[dict[str, Any]]:
-    """Re-transcribe an audio file and rewrite its VTT, with optional confidence filter."""
+    """Rewrite an audio file's VTT from its segments, with optional confidence filter.
+
+    If the saved segments JSON is at least as new as the audio, it is reused
+    instead of re-transcribing, so tuning the threshold costs no decode. The
+    JSON does not record the model, prompt or options that produced it; pass
+    ``force=True`` to re-transcribe after changing any of them.
+    """
     if not audio_path.exists():
         raise WhisperError(f"Audio file not found: {audio_path}")
 
     json_path = audio_path.with_suffix(".json")
     output_vtt = audio_path.with_suffix(".vtt")
 
+    if (
+        not force
+        and json_path.exists()
+        and audio_path.stat().st_mtime <= json_path.stat().st_mtime
+    ):
+        logger.info(f"Reusing saved segments from {json_path}")
+        return regenerate_vtt_with_confidence(json_path, output_vtt, confidence_threshold)
+
     segments = transcribe_file_direct(audio_path, output_vtt, prompt=WHISPER_PROMPT)
 
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(segments, f, indent=2)
 
-    if confidence_threshold is not None:
-        segments = regenerate_vtt_with_confidence(json_path, output_vtt, confidence_threshold)
+    if confidence_threshold is None:
+        return segments
 
+    # Filter in memory rather than round-tripping through the JSON just written.
+    segments = filter_by_confidence(segments, confidence_threshold)
+    _write_vtt(output_vtt, segments)
     return segments
@@ -5,12 +5,16 @@ from pathlib import Path
 
 import pytest
 
-from tools.create_sample_files import create_sample_files
 
-
-@pytest.fixture(scope="session", autouse=True)
+@pytest.fixture(scope="session")
 def setup_test_files():
-    """Create tmp/input/test_jfk*.wav before tests, remove after."""
+    """Create tmp/input/test_jfk*.wav before tests, remove after.
+
+    Opt in with ``pytest.mark.usefixtures("setup_test_files")``. The import is
+    deferred so fast, pure-Python test runs never load the audio stack.
+    """
+    from tools.create_sample_files import create_sample_files
+
     input_dir = Path('tmp/input')
     input_dir.mkdir(parents=True, exist_ok=True)
 
@@ -20,3 +24,18 @@ def setup_test_files():
 
     (input_dir / 'test_jfk.wav').unlink(missing_ok=True)
     (input_dir / 'test_jfk_padded.wav').unlink(missing_ok=True)
+
+
+@pytest.fixture(scope="session")
+def jfk_transcription(setup_test_files):
+    """transcribe_audio() of tmp/input/test_jfk.wav, run once per session.
+
+    Both the whisper and transcription suites need this file transcribed;
+    sharing it saves a full pipeline run. The result cache is off for the
+    whole session so these suites always run real whisper inference.
+    """
+    from src.transcribe import transcribe_audio
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("src.whisper.TRANSCRIPTION_CACHE", False)
+        yield transcribe_audio(Path('tmp/input/test_jfk.wav'))
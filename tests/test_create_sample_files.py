@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Test sample file creation and its skip-if-fresh checks."""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from tools.create_sample_files import create_copies, create_padded_audio
+
+SR = 16000
+
+
+@pytest.fixture
+def source_wav(tmp_path):
+    """A 0.1 s synthetic mono WAV."""
+    path = tmp_path / "jfk.wav"
+    sf.write(str(path), np.linspace(-0.5, 0.5, SR // 10, dtype='float32'), SR)
+    return path
+
+
+class TestCreateCopies:
+    """Tests for numbered copies."""
+
+    def test_second_call_skips(self, tmp_path, source_wav, capsys):
+        out_dir = tmp_path / "out"
+        create_copies(source_wav, out_dir, num_copies=2)
+        capsys.readouterr()
+
+        create_copies(source_wav, out_dir, num_copies=2)
+        assert capsys.readouterr().out.count("Up to date") == 2
+
+    def test_truncated_copy_rebuilds(self, tmp_path, source_wav, capsys):
+        out_dir = tmp_path / "out"
+        create_copies(source_wav, out_dir, num_copies=1, prefix="test_")
+        dest = out_dir / "test_jfk.wav"
+        dest.write_bytes(dest.read_bytes()[:100])
+        capsys.readouterr()
+
+        create_copies(source_wav, out_dir, num_copies=1, prefix="test_")
+        assert "Created" in capsys.readouterr().out
+        assert dest.read_bytes() == source_wav.read_bytes()
+
+
+class TestCreatePaddedAudio:
+    """Tests for the padded file and its expected frame count."""
+
+    def test_frame_count(self, tmp_path, source_wav):
+        output = tmp_path / "padded.wav"
+        create_padded_audio(source_wav, output, num_copies=3, silence_duration=0.5)
+        assert sf.info(str(output)).frames == 3 * (SR // 10) + 2 * (SR // 2)
+
+    def test_second_call_skips(self, tmp_path, source_wav, capsys):
+        output = tmp_path / "padded.wav"
+        create_padded_audio(source_wav, output, num_copies=3, silence_duration=0.5)
+        capsys.readouterr()
+
+        create_padded_audio(source_wav, output, num_copies=3, silence_duration=0.5)
+        assert "Up to date" in capsys.readouterr().out
+
+    def test_changed_num_copies_rebuilds(self, tmp_path, source_wav):
+        output = tmp_path / "padded.wav"
+        create_padded_audio(source_wav, output, num_copies=3, silence_duration=0.5)
+        create_padded_audio(source_wav, output, num_copies=2, silence_duration=0.5)
+        assert sf.info(str(output)).frames == 2 * (SR // 10) + SR // 2
+
+    def test_truncated_output_rebuilds(self, tmp_path, source_wav):
+        output = tmp_path / "padded.wav"
+        create_padded_audio(source_wav, output, num_copies=3, silence_duration=0.5)
+        output.write_bytes(output.read_bytes()[:20])
+
+        create_padded_audio(source_wav, output, num_copies=3, silence_duration=0.5)
+        assert sf.info(str(output)).frames == 3 * (SR // 10) + 2 * (SR // 2)
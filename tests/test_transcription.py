@@ -8,11 +8,13 @@ from src.config import OUTPUT_DIR
 import json
 from difflib import SequenceMatcher
 
+pytestmark = pytest.mark.usefixtures("setup_test_files")
+
 def similar(a: str, b: str) -> float:
     """Calculate string similarity ratio."""
     return SequenceMatcher(None, a, b).ratio()
 
-def test_segmented_transcription():
+def test_segmented_transcription(jfk_transcription):
     """Test that transcribing a padded file produces similar content to the original."""
     # Get paths to test files
     original_file = Path('tmp/input/test_jfk.wav')
@@ -20,9 +22,8 @@ def test_segmented_transcription():
     assert original_file.exists(), "Original test file not found"
     assert padded_file.exists(), "Padded test file not found"
 
-    # Transcribe both files
-    original_result = transcribe_audio(original_file)
-    padded_result = transcribe_audio(padded_file)
+    # The original is transcribed once per session by the jfk_transcription fixture
+    transcribe_audio(padded_file)
 
     # Get the full original transcription
     original_vtt = OUTPUT_DIR / original_file.stem / f"{original_file.stem}.vtt"
@@ -7,6 +7,8 @@ from src.vad import load_vad_model, process_audio, VADError
 from src.config import OUTPUT_DIR
 import json
 
+pytestmark = pytest.mark.usefixtures("setup_test_files")
+
 def test_vad_model_loading():
     """Test that the VAD model loads successfully."""
     model = load_vad_model()
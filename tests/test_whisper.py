@@ -2,18 +2,25 @@
 """Test Whisper transcription."""
 
 from pathlib import Path
+from typing import Any
 import pytest
-from src.transcribe import transcribe_audio
 from src.config import OUTPUT_DIR
+from src.whisper import (
+    format_timestamp,
+    load_whisper_model,
+    regenerate_vtt_for_audio,
+    transcribe_audio_segments,
+    transcribe_segment,
+    unload_whisper_model,
+)
 import json
 
-def test_basic_transcription():
+
+def test_basic_transcription(jfk_transcription):
     """Test transcription of the original JFK audio file."""
     input_file = Path('tmp/input/test_jfk.wav')
     assert input_file.exists(), "Test JFK file not found"
-
-    # Transcribe the file
-    result = transcribe_audio(input_file)
+    result = jfk_transcription
 
     # Verify result structure
     assert 'segments' in result, "No segments in transcription result"
@@ -46,3 +53,230 @@ def test_basic_transcription():
             assert 'text' in segment, "Missing text"
             assert segment['end'] > segment['start'], "Invalid segment timing"
             assert len(segment['text'].strip()) > 0, "Empty segment text"
+
+
+class TestModelCache:
+    """load_whisper_model keeps one model per (name, device) for the process."""
+
+    @pytest.fixture
+    def fake_models_dir(self, tmp_path, monkeypatch):
+        (tmp_path / "fake.pt").touch()
+        loads = []
+
+        def fake_load_model(name, **kw):
+            loads.append(name)
+            return object()
+
+        monkeypatch.setattr("src.whisper.WHISPER_MODELS_DIR", tmp_path)
+        monkeypatch.setattr("src.whisper.whisper.load_model", fake_load_model)
+        yield loads
+        unload_whisper_model()
+
+    def test_second_load_reuses_model(self, fake_models_dir):
+        first = load_whisper_model("fake")
+        assert load_whisper_model("fake") is first
+        assert fake_models_dir == ["fake"]
+
+    def test_unload_forces_reload(self, fake_models_dir):
+        load_whisper_model("fake")
+        unload_whisper_model()
+        load_whisper_model("fake")
+        assert fake_models_dir == ["fake", "fake"]
+
+
+class TestFormatTimestamp:
+    def test_zero(self):
+        assert format_timestamp(0.0) == "00:00:00.000"
+
+    def test_hours_minutes_millis(self):
+        assert format_timestamp(3723.456) == "01:02:03.456"
+
+    def test_float_noise_does_not_drop_a_millisecond(self):
+        # 1.001 * 1000 == 1000.9999999999999 in floating point
+        assert format_timestamp(1.001) == "00:00:01.001"
+
+    def test_past_one_day(self):
+        assert format_timestamp(90061.5) == "25:01:01.500"
+
+
+class TestRegenerateVtt:
+    def test_fresh_json_skips_transcription(self, tmp_path, monkeypatch):
+        audio = tmp_path / "clip.wav"
+        audio.touch()
+        segments = [
+            {"start": 0.0, "end": 1.0, "text": "keep", "confidence": 80.0},
+            {"start": 1.0, "end": 2.0, "text": "drop", "confidence": 20.0},
+        ]
+        audio.with_suffix(".json").write_text(json.dumps(segments))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("should not re-transcribe")
+
+        monkeypatch.setattr("src.whisper.transcribe_file_direct", fail)
+        kept = regenerate_vtt_for_audio(audio, confidence_threshold=50)
+
+        assert [s["text"] for s in kept] == ["keep"]
+        vtt = audio.with_suffix(".vtt").read_text()
+        assert "keep" in vtt and "drop" not in vtt
+
+    def test_force_retranscribes_over_fresh_json(self, tmp_path, monkeypatch):
+        audio = tmp_path / "clip.wav"
+        audio.touch()
+        audio.with_suffix(".json").write_text(
+            json.dumps([{"start": 0.0, "end": 1.0, "text": "stale", "confidence": 80.0}])
+        )
+        fresh = [{"start": 0.0, "end": 1.0, "text": "fresh", "confidence": 80.0}]
+        monkeypatch.setattr("src.whisper.transcribe_file_direct", lambda *a, **kw: fresh)
+
+        assert regenerate_vtt_for_audio(audio, force=True) == fresh
+        assert json.loads(audio.with_suffix(".json").read_text()) == fresh
+
+
+class TestTranscribeAudioSegments:
+    @staticmethod
+    def _stub_segments(monkeypatch, results):
+        """Make transcribe_segment return ``results[path.name]`` (or raise it)."""
+
+        def fake_transcribe_segment(path, output_path, offset, model):
+            result = results[path.name]
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        monkeypatch.setattr("src.whisper.transcribe_segment", fake_transcribe_segment)
+
+    def test_repeated_lines_written_once(self, tmp_path, monkeypatch):
+        self._stub_segments(monkeypatch, {
+            "a.wav": [{"start": 0.0, "end": 1.0, "text": "hello", "confidence": 90.0}],
+            "b.wav": [
+                {"start": 5.0, "end": 6.0, "text": "hello", "confidence": 90.0},
+                {"start": 6.0, "end": 7.0, "text": "world", "confidence": 90.0},
+            ],
+        })
+        vtt = tmp_path / "user.vtt"
+
+        transcribe_audio_segments(
+            [(tmp_path / "a.wav", 0.0), (tmp_path / "b.wav", 5.0)], vtt, model=object()
+        )
+
+        cues = [line for line in vtt.read_text().splitlines() if line and "-->" not in line]
+        assert cues == ["WEBVTT", "hello", "world"]
+        assert not vtt.with_suffix(".vtt.tmp").exists()
+
+    def test_interrupted_run_keeps_previous_vtt(self, tmp_path, monkeypatch):
+        self._stub_segments(monkeypatch, {
+            "a.wav": [{"start": 0.0, "end": 1.0, "text": "new", "confidence": 90.0}],
+            "b.wav": KeyboardInterrupt(),
+        })
+        vtt = tmp_path / "user.vtt"
+        vtt.write_text("WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nold\n\n")
+
+        with pytest.raises(KeyboardInterrupt):
+            transcribe_audio_segments(
+                [(tmp_path / "a.wav", 0.0), (tmp_path / "b.wav", 5.0)], vtt, model=object()
+            )
+
+        assert "old" in vtt.read_text() and "new" not in vtt.read_text()
+        assert not vtt.with_suffix(".vtt.tmp").exists()
+
+    def test_overlapping_segments_merge_like_sort(self, tmp_path, monkeypatch):
+        # VAD padding makes neighbouring clips overlap, so b.wav's cues start
+        # before a.wav's last one and both clips hear "overlap".
+        a: list[dict[str, Any]] = [
+            {"start": 0.0, "end": 2.0, "text": "first", "confidence": 90.0},
+            {"start": 2.0, "end": 3.0, "text": "overlap", "confidence": 90.0},
+            {"start": 3.0, "end": 3.5, "text": "tail", "confidence": 90.0},
+        ]
+        b: list[dict[str, Any]] = [
+            {"start": 2.5, "end": 3.0, "text": "overlap", "confidence": 90.0},
+            {"start": 3.0, "end": 4.0, "text": "tie", "confidence": 90.0},
+            {"start": 4.0, "end": 5.0, "text": "last", "confidence": 90.0},
+        ]
+        self._stub_segments(monkeypatch, {"a.wav": a, "b.wav": b})
+        vtt = tmp_path / "user.vtt"
+
+        merged = transcribe_audio_segments(
+            [(tmp_path / "a.wav", 0.0), (tmp_path / "b.wav", 2.5)], vtt, model=object()
+        )
+
+        assert merged == sorted(a + b, key=lambda s: s["start"])
+        cues = [line for line in vtt.read_text().splitlines() if line and "-->" not in line]
+        assert cues == ["WEBVTT", "first", "overlap", "tail", "tie", "last"]
+
+
+class TestResultCache:
+    @pytest.fixture
+    def decodes(self, tmp_path, monkeypatch):
+        calls = []
+
+        def fake_run(model, audio, options):
+            calls.append(1)
+            return {"segments": [{"start": 0.5, "end": 1.5, "text": " hi", "avg_logprob": -0.2}]}
+
+        monkeypatch.setattr("src.whisper.TRANSCRIPTION_CACHE", True)
+        monkeypatch.setattr("src.whisper._RESULT_CACHE_DIR", tmp_path / ".cache")
+        monkeypatch.setattr("src.whisper._MODEL_CACHE", {})
+        monkeypatch.setattr("src.whisper._load_audio", lambda path, device: None)
+        monkeypatch.setattr("src.whisper._run_transcribe", fake_run)
+        return calls
+
+    @staticmethod
+    def _loaded(name):
+        """A stand-in model registered as if load_whisper_model had loaded it."""
+        from src import whisper as whisper_mod
+
+        model = type("M", (), {"device": "cpu", "dims": name})()
+        whisper_mod._MODEL_CACHE[(name, "cpu")] = model
+        return model
+
+    def test_hit_skips_decode_and_applies_offset(self, tmp_path, decodes):
+        audio = tmp_path / "seg.wav"
+        audio.write_bytes(b"RIFF-fake")
+        model = self._loaded("tiny")
+
+        first = transcribe_segment(audio, offset=10.0, model=model)
+        second = transcribe_segment(audio, offset=20.0, model=model)
+
+        assert len(decodes) == 1
+        assert (first[0]["start"], first[0]["end"]) == (10.5, 11.5)
+        assert (second[0]["start"], second[0]["end"]) == (20.5, 21.5)
+        assert second[0]["text"] == "hi"
+
+    def test_hit_reapplies_post_processing(self, tmp_path, decodes, monkeypatch):
+        audio = tmp_path / "seg.wav"
+        audio.write_bytes(b"RIFF-fake")
+        model = self._loaded("tiny")
+        transcribe_segment(audio, model=model)
+
+        (entry,) = (tmp_path / ".cache").glob("*.json")
+        assert json.loads(entry.read_text())[0]["avg_logprob"] == -0.2
+
+        monkeypatch.setattr("src.whisper.collapse_repetition", lambda text: text.upper())
+        hit = transcribe_segment(audio, model=model)
+        assert len(decodes) == 1
+        assert hit[0]["text"] == "HI"
+        assert hit[0]["confidence"] == pytest.approx(80.0)
+
+    def test_different_audio_misses(self, tmp_path, decodes):
+        model = self._loaded("tiny")
+        for i, payload in enumerate([b"one", b"two"]):
+            audio = tmp_path / f"seg{i}.wav"
+            audio.write_bytes(payload)
+            transcribe_segment(audio, model=model)
+        assert len(decodes) == 2
+
+    def test_different_model_misses(self, tmp_path, decodes):
+        audio = tmp_path / "seg.wav"
+        audio.write_bytes(b"RIFF-fake")
+        transcribe_segment(audio, model=self._loaded("tiny"))
+        transcribe_segment(audio, model=self._loaded("large-v3"))
+        assert len(decodes) == 2
+
+    def test_unregistered_model_is_not_cached(self, tmp_path, decodes):
+        audio = tmp_path / "seg.wav"
+        audio.write_bytes(b"RIFF-fake")
+        model = type("M", (), {"device": "cpu"})()
+        transcribe_segment(audio, model=model)
+        transcribe_segment(audio, model=model)
+        assert len(decodes) == 2
+        assert not (tmp_path / ".cache").exists()
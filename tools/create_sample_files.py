@@ -6,9 +6,16 @@ import shutil
 import sys
 from pathlib import Path
 
+import numpy as np
 import soundfile as sf
-import torch
-import torchaudio
+
+
+def _is_fresh(output_path: Path, input_path: Path) -> bool:
+    """True if output_path exists and was written after input_path last changed."""
+    try:
+        return output_path.stat().st_mtime >= input_path.stat().st_mtime
+    except FileNotFoundError:
+        return False
 
 
 def create_copies(
@@ -29,14 +36,16 @@ def create_copies(
     stem, suffix = input_path.stem, input_path.suffix
 
     if num_copies == 1:
-        dest = output_dir / f"{prefix}{stem}{suffix}"
-        shutil.copy2(input_path, dest)
-        print(f"Created {dest}")
-        return
-
-    for i in range(num_copies):
-        dest = output_dir / f"{prefix}{stem}_{i + 1}{suffix}"
-        shutil.copy2(input_path, dest)
+        dests = [output_dir / f"{prefix}{stem}{suffix}"]
+    else:
+        dests = [output_dir / f"{prefix}{stem}_{i + 1}{suffix}" for i in range(num_copies)]
+
+    size = input_path.stat().st_size
+    for dest in dests:
+        if _is_fresh(dest, input_path) and dest.stat().st_size == size:
+            print(f"Up to date: {dest}")
+            continue
+        shutil.copyfile(input_path, dest)
         print(f"Created {dest}")
 
 
@@ -51,15 +60,31 @@ def create_padded_audio(
         print(f"Error: Input file {input_path} not found")
         return
 
-    wav, sr = torchaudio.load(str(input_path))
-    silence = torch.zeros((wav.shape[0], int(silence_duration * sr)))
-
-    padded_wav = wav
-    for _ in range(num_copies - 1):
-        padded_wav = torch.cat([padded_wav, silence, wav], dim=1)
-
+    # Skip the rebuild when the existing file is newer than the input and has
+    # exactly the length this num_copies/silence_duration would produce.
+    if _is_fresh(output_path, input_path):
+        info = sf.info(str(input_path))
+        expected = num_copies * info.frames + (num_copies - 1) * int(silence_duration * info.samplerate)
+        try:
+            up_to_date = sf.info(str(output_path)).frames == expected
+        except RuntimeError:  # unreadable/truncated output; rebuild it
+            up_to_date = False
+        if up_to_date:
+            print(f"Up to date: {output_path}")
+            return
+
+    audio, sr = sf.read(str(input_path), dtype='float32', always_2d=True)
+    silence = np.zeros((int(silence_duration * sr), audio.shape[1]), dtype='float32')
+
+    # Stream the copies straight to disk instead of concatenating in memory.
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    sf.write(str(output_path), padded_wav.T.numpy(), sr)
+    with sf.SoundFile(
+        str(output_path), mode='w', samplerate=sr, channels=audio.shape[1]
+    ) as out:
+        for i in range(num_copies):
+            if i:
+                out.write(silence)
+            out.write(audio)
     print(f"Created padded version: {output_path}")
 
 
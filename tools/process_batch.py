@@ -7,7 +7,7 @@ import os
 import signal
 import sys
 import time
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 from typing import MutableMapping
 
@@ -20,26 +20,42 @@ multiprocessing.set_start_method("spawn", force=True)
 
 AUDIO_EXTENSIONS = {".wav", ".flac", ".mp3", ".m4a", ".ogg", ".aac", ".opus"}
 
+# Thread-pool sizes read by OpenMP / MKL / OpenBLAS / Accelerate at load time.
+_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+# Display label and style for statuses that carry no progress counter.
+_STATIC_STATUS = {
+    "waiting": ("waiting", "dim"),
+    "converting": ("converting", "yellow"),
+    "splitting": ("splitting", "yellow"),
+    "loading model": ("loading model", "blue"),
+    "done": ("\u2713 done", "green"),
+}
+
 
 def find_audio_files(target_dir: Path) -> list[Path]:
     """Find audio files in target directory, excluding converted files."""
     files = []
-    for f in sorted(target_dir.iterdir()):
-        if f.is_file() and f.suffix.lower() in AUDIO_EXTENSIONS and "_converted" not in f.stem:
-            files.append(f)
-    return files
+    # One readdir; DirEntry.is_file() uses the cached d_type, so no per-file stat.
+    with os.scandir(target_dir) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext.lower() in AUDIO_EXTENSIONS and "_converted" not in stem and entry.is_file():
+                files.append(Path(entry.path))
+    return sorted(files)
 
 
-def _worker(
-    file_path: str,
-    status_dict: "MutableMapping[str, str]",
-    status_key: str,
-    torch_threads: int,
-) -> tuple[str, str, str]:
-    """Worker function that runs in a subprocess.
+def _worker_init(torch_threads: int) -> None:
+    """Pool initializer: one-time setup for each worker process.
 
-    Returns:
-        (filename, "done" or "error", error_message_or_empty)
+    Workers are long-lived and take many files each, so per-process state set
+    here (and the whisper model cached by load_whisper_model) is reused for
+    every file after the first.
     """
     # Lower scheduling priority so foreground apps stay responsive
     try:
@@ -47,35 +63,44 @@ def _worker(
     except OSError:
         pass
 
-    # Limit torch threads per worker
+    # Silence the worker for its whole life — the rich table is the UI.
+    # Redirecting the fds (not just sys.stdout/sys.stderr) also catches output
+    # from C extensions and child processes such as ffmpeg.
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    os.close(devnull)
+    logging.disable(logging.CRITICAL)
+
+    # Limit torch threads per worker. The BLAS/OpenMP pools size themselves
+    # from these env vars when torch is first imported, so set them before
+    # that import; set_num_threads alone can leave a larger pool already up.
     if torch_threads > 0:
+        for var in _THREAD_ENV_VARS:
+            os.environ[var] = str(torch_threads)
         try:
             import torch
             torch.set_num_threads(torch_threads)
         except Exception:
             pass
 
-    # Suppress all logging output — the rich table is the UI
-    logging.disable(logging.CRITICAL)
 
-    # Also suppress stdout/stderr from submodules
-    devnull = open(os.devnull, "w")
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
-    sys.stdout = devnull
-    sys.stderr = devnull
+def _worker(
+    file_path: str,
+    status_dict: "MutableMapping[str, str]",
+    status_key: str,
+) -> tuple[str, str, str]:
+    """Worker function that runs in a subprocess.
 
+    Returns:
+        (filename, "done" or "error", error_message_or_empty)
+    """
     try:
         from tools.process_single_file import main as process_main
         process_main(file_path, status_dict=status_dict, status_key=status_key)
         return (Path(file_path).name, "done", "")
     except Exception as e:
         return (Path(file_path).name, "error", str(e))
-    finally:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
-        devnull.close()
-        logging.disable(logging.NOTSET)
 
 
 def _build_table(
@@ -98,15 +123,8 @@ def _build_table(
 
 def _status_display(raw_status: str) -> tuple[str, str]:
     """Map a raw status string to a display label and style."""
-    static = {
-        "waiting": ("waiting", "dim"),
-        "converting": ("converting", "yellow"),
-        "splitting": ("splitting", "yellow"),
-        "loading model": ("loading model", "blue"),
-        "done": ("\u2713 done", "green"),
-    }
-    if raw_status in static:
-        return static[raw_status]
+    if raw_status in _STATIC_STATUS:
+        return _STATIC_STATUS[raw_status]
     if raw_status.startswith("transcribing"):
         return (raw_status, "magenta")
     if raw_status.startswith("error"):
@@ -176,40 +194,39 @@ def main() -> None:
     old_handler = signal.signal(signal.SIGINT, _sigint_handler)
 
     try:
-        with Live(_build_table(file_names, status_dict, max_workers), refresh_per_second=4) as live:
-            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Redraws are driven by status changes below, not by a refresh timer.
+        with Live(_build_table(file_names, status_dict, max_workers), auto_refresh=False) as live:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_worker_init,
+                initargs=(torch_threads,),
+            ) as executor:
                 executor_ref = executor
-                futures = {}
-                for f in files:
-                    fut = executor.submit(
-                        _worker,
-                        str(f),
-                        status_dict,
-                        f.name,
-                        torch_threads,
-                    )
-                    futures[fut] = f.name
-
-                # Poll for status updates instead of blocking on as_completed
-                while True:
-                    live.update(_build_table(file_names, status_dict, max_workers))
-
-                    done_futures = [f for f in futures if f.done()]
-                    for fut in done_futures:
-                        if fut in futures:
-                            name, status, err_msg = fut.result()
-                            if status == "error":
-                                status_dict[name] = "error"
-                                errors.append((name, err_msg))
-                            del futures[fut]
-
-                    if not futures:
-                        break
-
-                    time.sleep(0.25)
+                # Longest first (size as a proxy for duration) so one big file
+                # doesn't start last and run alone; the table stays alphabetical.
+                pending = {
+                    executor.submit(_worker, str(f), status_dict, f.name)
+                    for f in sorted(files, key=lambda p: p.stat().st_size, reverse=True)
+                }
+
+                # One proxy round-trip per tick: snapshot the shared dict and
+                # only rebuild the table when something actually changed.
+                shown: dict[str, str] = {}
+                while pending:
+                    snapshot = status_dict.copy()
+                    if snapshot != shown:
+                        live.update(_build_table(file_names, snapshot, max_workers), refresh=True)
+                        shown = snapshot
+
+                    done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        name, status, err_msg = fut.result()
+                        if status == "error":
+                            status_dict[name] = "error"
+                            errors.append((name, err_msg))
 
                 # Final refresh
-                live.update(_build_table(file_names, status_dict, max_workers))
+                live.update(_build_table(file_names, status_dict.copy(), max_workers), refresh=True)
     finally:
         signal.signal(signal.SIGINT, old_handler)
 
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Quick smoke test: run whisper on a single file and print the transcript."""
+"""Quick smoke test: run whisper on one or more files and print the transcripts."""
 
 import argparse
 from pathlib import Path
@@ -9,23 +9,30 @@ import torch
 from src.whisper import load_whisper_model
 
 
-def test_whisper(audio_file: str | Path) -> None:
-    print(f"\nTesting whisper transcription on {audio_file}...")
+def test_whisper(audio_files: list[str | Path]) -> None:
     print(f"Device available: {'cuda' if torch.cuda.is_available() else 'cpu'}")
 
     try:
+        # Loaded once; every file below reuses the same resident model.
         model = load_whisper_model()
-        result = model.transcribe(str(audio_file))
-        print("\nTranscription result:")
-        print("-" * 80)
-        print(result["text"])
-        print("-" * 80)
     except Exception as e:
-        print(f"Error during transcription: {e}")
+        print(f"Error loading whisper model: {e}")
+        return
+
+    for audio_file in audio_files:
+        print(f"\nTesting whisper transcription on {audio_file}...")
+        try:
+            result = model.transcribe(str(audio_file))
+            print("\nTranscription result:")
+            print("-" * 80)
+            print(result["text"])
+            print("-" * 80)
+        except Exception as e:
+            print(f"Error during transcription: {e}")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test whisper transcription")
-    parser.add_argument("audio_file", help="Path to audio file to test")
+    parser.add_argument("audio_files", nargs="+", help="Audio file(s) to test")
     args = parser.parse_args()
-    test_whisper(args.audio_file)
+    test_whisper(args.audio_files)